@@ -0,0 +1,212 @@
+import ast
+from collections import deque
+
+# --- AST ANALYSIS ENGINE ---
+# DEFINING THE "DANGEROUS" FUNCTIONS
+# This set tells the engine what to look for.
+DANGEROUS_SINKS: frozenset[str] = frozenset({
+    'yaml.load',
+    'subprocess.call', 'subprocess.run', 'subprocess.Popen',
+    'os.system', 'os.popen',
+    'eval', 'exec', 'pickle.loads'
+})
+
+# Decorator attributes that register a route (@app.get, @router.post, ...)
+HTTP_METHODS = frozenset({"get", "post", "put", "delete", "patch", "head", "options"})
+
+# Routes under these prefixes are treated as internal (not internet-facing)
+INTERNAL_PREFIXES = ("/internal", "/admin")
+
+class VulnerabilityVisitor(ast.NodeVisitor):
+    def __init__(self):
+        # Graph storage: node names are interned to small ints and their
+        # attributes kept in parallel lists indexed by that int.
+        self._ids: dict[str, int] = {}
+        self._names: list[str] = []
+        self._types: list[str] = []
+        self._colors: list[str] = []
+        self._labels: list[str] = []
+        self._adj: list[list[int]] = []
+        # Membership test for _add_edge; _adj keeps the ordered output
+        self._edges: set[tuple[int, int]] = set()
+        self.current_function = None
+        self.vulnerabilities = []
+        # Plain-name calls made by each function, resolved to call edges
+        # once every function definition in the module is known
+        self.calls: dict[str, list[str]] = {}
+        self.reset()
+
+    def reset(self):
+        # Forget the previous analysis so a pooled visitor can be reused
+        self._ids.clear()
+        self._names.clear()
+        self._types.clear()
+        self._colors.clear()
+        self._labels.clear()
+        self._adj.clear()
+        self._edges.clear()
+        self.current_function = None
+        self.vulnerabilities.clear()
+        self.calls.clear()
+
+        # The INTERNET source is always node 0
+        self._node("INTERNET", 'source', '#00f2ff', 'INTERNET')
+
+    # Node types whose subtrees can never hold a call or a function
+    # definition, so descending into them is wasted work.
+    _LEAF_TYPES = (
+        ast.Name, ast.Constant, ast.expr_context,
+        ast.Import, ast.ImportFrom, ast.Pass, ast.Break, ast.Continue,
+        ast.Global, ast.Nonlocal,
+    )
+
+    def generic_visit(self, node):
+        for child in ast.iter_child_nodes(node):
+            if not isinstance(child, self._LEAF_TYPES):
+                self.visit(child)
+
+    def _node(self, name, node_type, color, label):
+        # Returns the node's int id, adding it (or refreshing its attributes)
+        node_id = self._ids.get(name)
+        if node_id is None:
+            node_id = len(self._names)
+            self._ids[name] = node_id
+            self._names.append(name)
+            self._types.append(node_type)
+            self._colors.append(color)
+            self._labels.append(label)
+            self._adj.append([])
+        else:
+            self._types[node_id] = node_type
+            self._colors[node_id] = color
+            self._labels[node_id] = label
+        return node_id
+
+    def _add_edge(self, source, target):
+        edge = (source, target)
+        if edge not in self._edges:
+            self._edges.add(edge)
+            self._adj[source].append(target)
+
+    def _reachable(self):
+        # BFS from INTERNET; seen[n] is set for every node it can reach.
+        seen = bytearray(len(self._adj))
+        seen[0] = 1
+        queue = deque([0])
+        while queue:
+            node = queue.popleft()
+            for nxt in self._adj[node]:
+                if not seen[nxt]:
+                    seen[nxt] = 1
+                    queue.append(nxt)
+        return seen
+
+    def path_to(self, name):
+        # Shortest INTERNET -> name path as node names, or None if unreachable.
+        target = self._ids.get(name)
+        if target is None:
+            return None
+        parent = [-1] * len(self._adj)
+        parent[0] = 0
+        queue = deque([0])
+        while queue:
+            node = queue.popleft()
+            if node == target:
+                path = [node]
+                while node:
+                    node = parent[node]
+                    path.append(node)
+                return [self._names[n] for n in reversed(path)]
+            for nxt in self._adj[node]:
+                if parent[nxt] < 0:
+                    parent[nxt] = node
+                    queue.append(nxt)
+        return None
+
+    def cytoscape_elements(self):
+        elements = [
+            {"data": {"id": name, "type": node_type, "color": color, "label": label}}
+            for name, node_type, color, label in zip(self._names, self._types, self._colors, self._labels)
+        ]
+        elements.extend(
+            {"data": {"source": self._names[source], "target": self._names[target]}}
+            for source, targets in enumerate(self._adj)
+            for target in targets
+        )
+        return elements
+
+    def visit_Module(self, node):
+        self.generic_visit(node)
+
+        # Link callers to helpers defined in this module, so a sink behind
+        # a helper is still reachable from the route that calls it.
+        for caller, callees in self.calls.items():
+            caller_id = self._ids[caller]
+            for callee in callees:
+                callee_id = self._ids.get(callee)
+                if callee_id is not None and callee_id != caller_id and self._types[callee_id] == 'function':
+                    self._add_edge(caller_id, callee_id)
+
+        # One traversal from INTERNET answers reachability for every sink.
+        seen = self._reachable()
+        for vuln in self.vulnerabilities:
+            vuln['reachable'] = bool(seen[self._ids[vuln['id']]])
+
+    def visit_FunctionDef(self, node):
+        # Save the enclosing function so nested defs don't drop attribution
+        # for calls that follow them in the outer body.
+        enclosing_function = self.current_function
+        self.current_function = node.name
+        function_id = self._node(node.name, 'function', '#2d3442', node.name)
+        
+        # Detect Routes (FastAPI/Flask decorators)
+        for decorator in node.decorator_list:
+            # Check for @app.get, @app.post, etc.
+            if isinstance(decorator, ast.Call) and getattr(decorator.func, 'attr', None) in HTTP_METHODS:
+                # Get the route path (e.g., "/public/network_tool"). Only a literal
+                # "/..." string counts, so @mock.patch("os.system") or @app.get(PATH)
+                # are not mistaken for routes.
+                path_arg = decorator.args[0] if decorator.args else None
+                if (isinstance(path_arg, ast.Constant) and isinstance(path_arg.value, str)
+                        and path_arg.value.startswith('/')):
+                    route_path = path_arg.value
+                    
+                    # Add Route Node
+                    route_id = f"ROUTE: {route_path}"
+                    route_node = self._node(route_id, 'route', '#ff9f1c', route_path)
+                    self._add_edge(route_node, function_id)
+
+                    # Check Reachability (Public vs Internal)
+                    # If the route does NOT start with /internal or /admin, it is PUBLIC.
+                    if not route_path.startswith(INTERNAL_PREFIXES):
+                        self._add_edge(0, route_node)
+        
+        self.generic_visit(node)
+        self.current_function = enclosing_function
+
+    def visit_Call(self, node):
+        # Identify the function being called
+        func_name = None
+        if isinstance(node.func, ast.Name):
+            func_name = node.func.id
+        elif isinstance(node.func, ast.Attribute):
+            # Handles module.function (e.g., subprocess.call)
+            if isinstance(node.func.value, ast.Name):
+                func_name = f"{node.func.value.id}.{node.func.attr}"
+
+        # CHECK IF DANGEROUS
+        if func_name in DANGEROUS_SINKS:
+            vuln_id = f"VULN: {func_name}"
+            # Reachability is filled in by visit_Module once the graph is complete
+            self.vulnerabilities.append({'id': vuln_id, 'reachable': False})
+            
+            # Add Vulnerability Node (Red)
+            vuln_node = self._node(vuln_id, 'vulnerability', '#ff3355', f"⚠️ {func_name}")
+            
+            # Connect current function to this vulnerability
+            if self.current_function:
+                self._add_edge(self._ids[self.current_function], vuln_node)
+        elif self.current_function and isinstance(node.func, ast.Name):
+            self.calls.setdefault(self.current_function, []).append(func_name)
+
+        self.generic_visit(node)
@@ -1,5 +1,4 @@
 import ast
-import networkx as nx
 import sys
 import os
 
@@ -7,7 +6,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
 # Import your actual engine logic
-from app.main import VulnerabilityVisitor
+from app.engine import VulnerabilityVisitor
 
 # --- TEST DATA 1: SAFE INTERNAL CODE ---
 # Logic: Uses os.system (dangerous), BUT is on an internal route.
@@ -35,6 +34,98 @@ def hack_me(cmd: str):
     subprocess.call(cmd, shell=True)
 """
 
+# --- TEST DATA 3: UNSAFE CODE BEHIND A HELPER ---
+# Logic: The public route calls a helper, and the helper uses os.system.
+# Expected: BLOCK
+HELPER_CODE = """
+import os
+from fastapi import FastAPI
+app = FastAPI()
+
+@app.get("/public/ping")
+def ping(host: str):
+    return run_ping(host)
+
+def run_ping(host):
+    os.system("ping " + host)
+"""
+
+# --- TEST DATA 4: UNSAFE CODE AFTER A NESTED DEF ---
+# Logic: The public route defines an inner function, then uses os.system.
+# Expected: BLOCK
+NESTED_CODE = """
+import os
+from fastapi import FastAPI
+app = FastAPI()
+
+@app.get("/public/report")
+def report(name: str):
+    def fmt(value):
+        return value.upper()
+    os.system("report " + name)
+"""
+
+# --- TEST DATA 5: UNSAFE PATCH ROUTE ---
+# Logic: Uses eval (dangerous) on a public route registered with @app.patch.
+# Expected: BLOCK
+PATCH_CODE = """
+from fastapi import FastAPI
+app = FastAPI()
+
+@app.patch("/public/settings")
+def update_settings(expr: str):
+    eval(expr)
+"""
+
+# --- TEST DATA 6: MOCK PATCH DECORATOR ---
+# Logic: @mock.patch shares its name with @app.patch but is not a route,
+# even with a Name argument. Uses subprocess (dangerous) in a test helper.
+# Expected: ALLOW
+MOCK_CODE = """
+import subprocess
+from unittest import mock
+
+TARGET = "os.system"
+
+@mock.patch("os.system")
+def test_backup(m):
+    subprocess.run(["backup_db.sh"])
+
+@mock.patch(TARGET)
+def test_restore(m):
+    subprocess.run(["restore_db.sh"])
+"""
+
+# --- EXPECTED GRAPH OUTPUT ---
+# Kill chain for HELPER_CODE, and the Cytoscape elements the original
+# networkx engine exported for UNSAFE_CODE.
+HELPER_KILL_CHAIN = ['INTERNET', 'ROUTE: /public/ping', 'ping', 'run_ping', 'VULN: os.system']
+UNSAFE_ELEMENTS = [
+    {'data': {'id': 'INTERNET', 'type': 'source', 'color': '#00f2ff', 'label': 'INTERNET'}},
+    {'data': {'id': 'hack_me', 'type': 'function', 'color': '#2d3442', 'label': 'hack_me'}},
+    {'data': {'id': 'ROUTE: /public/hack', 'type': 'route', 'color': '#ff9f1c', 'label': '/public/hack'}},
+    {'data': {'id': 'VULN: subprocess.call', 'type': 'vulnerability', 'color': '#ff3355', 'label': '⚠️ subprocess.call'}},
+    {'data': {'source': 'INTERNET', 'target': 'ROUTE: /public/hack'}},
+    {'data': {'source': 'hack_me', 'target': 'VULN: subprocess.call'}},
+    {'data': {'source': 'ROUTE: /public/hack', 'target': 'hack_me'}},
+]
+
+# --- TEST DATA 10: SAFE INTERNAL CODE BEHIND A HELPER ---
+# Logic: Only an internal /admin route calls a helper that uses os.system.
+# Expected: ALLOW
+ADMIN_HELPER_CODE = """
+import os
+from fastapi import FastAPI
+app = FastAPI()
+
+@app.post("/admin/restart")
+def restart(service: str):
+    return run_restart(service)
+
+def run_restart(service):
+    os.system("systemctl restart " + service)
+"""
+
 def test_logic():
     print("--- RUNNING SECURITY TESTS ---")
     
@@ -42,15 +133,13 @@ def test_logic():
     print("\n[TEST 1] Checking Internal Tool (Should be ALLOWED)...")
     visitor = VulnerabilityVisitor()
     tree = ast.parse(SAFE_CODE)
-    
-    # Simulate the Environment (The API usually does this part)
-    visitor.graph.add_node("INTERNET", type='source')
+
     visitor.visit(tree)
     
     # Check Reachability
     blocked = False
     for vuln in visitor.vulnerabilities:
-        if nx.has_path(visitor.graph, "INTERNET", vuln):
+        if vuln['reachable']:
             blocked = True
             
     if not blocked:
@@ -63,15 +152,13 @@ def test_logic():
     print("\n[TEST 2] Checking Public Exploit (Should be BLOCKED)...")
     visitor = VulnerabilityVisitor()
     tree = ast.parse(UNSAFE_CODE)
-    
-    # Simulate the Environment
-    visitor.graph.add_node("INTERNET", type='source')
+
     visitor.visit(tree)
     
     # Check Reachability
     blocked = False
     for vuln in visitor.vulnerabilities:
-        if nx.has_path(visitor.graph, "INTERNET", vuln):
+        if vuln['reachable']:
             blocked = True
             
     if blocked:
@@ -80,5 +167,141 @@ def test_logic():
         print("❌ FAIL: Public exploit was incorrectly ALLOWED.")
         exit(1) # Fail the pipeline
 
+    # TEST 3: UNSAFE CODE BEHIND A HELPER
+    print("\n[TEST 3] Checking Exploit Behind a Helper (Should be BLOCKED)...")
+    visitor = VulnerabilityVisitor()
+    tree = ast.parse(HELPER_CODE)
+
+    visitor.visit(tree)
+
+    # Check Reachability
+    blocked = False
+    for vuln in visitor.vulnerabilities:
+        if vuln['reachable']:
+            blocked = True
+
+    if blocked:
+        print("✅ PASS: Exploit behind a helper was correctly BLOCKED.")
+    else:
+        print("❌ FAIL: Exploit behind a helper was incorrectly ALLOWED.")
+        exit(1) # Fail the pipeline
+
+    # TEST 4: UNSAFE CODE AFTER A NESTED DEF
+    print("\n[TEST 4] Checking Exploit after a nested def (Should be BLOCKED)...")
+    visitor = VulnerabilityVisitor()
+    tree = ast.parse(NESTED_CODE)
+
+    visitor.visit(tree)
+
+    # Check Reachability
+    blocked = False
+    for vuln in visitor.vulnerabilities:
+        if vuln['reachable']:
+            blocked = True
+
+    if blocked:
+        print("✅ PASS: Exploit after a nested def was correctly BLOCKED.")
+    else:
+        print("❌ FAIL: Exploit after a nested def was incorrectly ALLOWED.")
+        exit(1) # Fail the pipeline
+
+    # TEST 5: UNSAFE PATCH ROUTE
+    print("\n[TEST 5] Checking Public PATCH exploit (Should be BLOCKED)...")
+    visitor = VulnerabilityVisitor()
+    tree = ast.parse(PATCH_CODE)
+
+    visitor.visit(tree)
+
+    # Check Reachability
+    blocked = False
+    for vuln in visitor.vulnerabilities:
+        if vuln['reachable']:
+            blocked = True
+
+    if blocked:
+        print("✅ PASS: Public PATCH exploit was correctly BLOCKED.")
+    else:
+        print("❌ FAIL: Public PATCH exploit was incorrectly ALLOWED.")
+        exit(1) # Fail the pipeline
+
+    # TEST 6: MOCK PATCH DECORATOR
+    print("\n[TEST 6] Checking Mock patch decorator (Should be ALLOWED)...")
+    visitor = VulnerabilityVisitor()
+    tree = ast.parse(MOCK_CODE)
+
+    visitor.visit(tree)
+
+    # Check Reachability
+    blocked = False
+    for vuln in visitor.vulnerabilities:
+        if vuln['reachable']:
+            blocked = True
+
+    if not blocked:
+        print("✅ PASS: Mock patch decorator was correctly ALLOWED.")
+    else:
+        print("❌ FAIL: Mock patch decorator was incorrectly BLOCKED.")
+        exit(1) # Fail the pipeline
+
+    # TEST 7: KILL CHAIN PATH
+    print("\n[TEST 7] Checking Kill Chain Path for Helper Code...")
+    visitor = VulnerabilityVisitor()
+    visitor.visit(ast.parse(HELPER_CODE))
+
+    path = visitor.path_to('VULN: os.system')
+    if path == HELPER_KILL_CHAIN:
+        print("✅ PASS: Kill chain path is correct.")
+    else:
+        print(f"❌ FAIL: Unexpected kill chain path {path}.")
+        exit(1) # Fail the pipeline
+
+    # TEST 8: CYTOSCAPE EXPORT
+    print("\n[TEST 8] Checking Cytoscape Export for Public Exploit...")
+    visitor = VulnerabilityVisitor()
+    visitor.visit(ast.parse(UNSAFE_CODE))
+
+    elements = visitor.cytoscape_elements()
+    if elements == UNSAFE_ELEMENTS:
+        print("✅ PASS: Cytoscape export matches the original graph.")
+    else:
+        print(f"❌ FAIL: Unexpected Cytoscape export {elements}.")
+        exit(1) # Fail the pipeline
+
+    # TEST 9: REUSED VISITOR
+    # The API pools visitors and calls reset() between requests.
+    print("\n[TEST 9] Checking a Reused Visitor (BLOCK, ALLOW, BLOCK)...")
+    visitor = VulnerabilityVisitor()
+    decisions = []
+    for code in (UNSAFE_CODE, SAFE_CODE, UNSAFE_CODE):
+        visitor.reset()
+        visitor.visit(ast.parse(code))
+        blocked = any(vuln['reachable'] for vuln in visitor.vulnerabilities)
+        decisions.append("BLOCK" if blocked else "ALLOW")
+
+    if decisions == ["BLOCK", "ALLOW", "BLOCK"] and visitor.cytoscape_elements() == UNSAFE_ELEMENTS:
+        print("✅ PASS: Reused visitor gave the same results as a fresh one.")
+    else:
+        print(f"❌ FAIL: Reused visitor gave {decisions}.")
+        exit(1) # Fail the pipeline
+
+    # TEST 10: SAFE INTERNAL CODE BEHIND A HELPER
+    print("\n[TEST 10] Checking Internal tool behind a helper (Should be ALLOWED)...")
+    visitor = VulnerabilityVisitor()
+    tree = ast.parse(ADMIN_HELPER_CODE)
+
+    visitor.visit(tree)
+
+    # Check Reachability
+    blocked = False
+    for vuln in visitor.vulnerabilities:
+        if vuln['reachable']:
+            blocked = True
+
+    if not blocked:
+        print("✅ PASS: Internal tool behind a helper was correctly ALLOWED.")
+    else:
+        print("❌ FAIL: Internal tool behind a helper was incorrectly BLOCKED.")
+        exit(1) # Fail the pipeline
+
 if __name__ == "__main__":
     test_logic()